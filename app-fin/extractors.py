@@ -0,0 +1,780 @@
+# 文档内容提取与关键词识别，供两个Gradio前端共用
+import os
+import asyncio
+import re
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Dict, Tuple
+import zipfile  # 用于解析Word文档和.xlsx文件
+import xml.etree.ElementTree as ET
+import zlib
+try:
+    from python_calamine import CalamineWorkbook  # 可选：更快的Excel解析器
+except ImportError:
+    CalamineWorkbook = None
+try:
+    import ahocorasick  # 可选：pyahocorasick，单次扫描匹配全部关键词
+except ImportError:
+    ahocorasick = None
+
+# Word文档正文XML的命名空间
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# .xlsx中工作表、工作簿关系文件的命名空间
+_S_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# 日期/时间格式的判断照搬openpyxl 3.1（openpyxl.styles.numbers）
+# Excel内置数字格式中的日期/时间格式，其余内置格式都不是日期
+_BUILTIN_DATE_FORMATS = {
+    14: 'mm-dd-yy',
+    15: 'd-mmm-yy',
+    16: 'd-mmm',
+    17: 'mmm-yy',
+    18: 'h:mm AM/PM',
+    19: 'h:mm:ss AM/PM',
+    20: 'h:mm',
+    21: 'h:mm:ss',
+    22: 'm/d/yy h:mm',
+    45: 'mm:ss',
+    46: '[h]:mm:ss',
+    47: 'mmss.0',
+}
+# 去掉引号内的文字和[]内容（[h]、[m]、[s]除外）后，是否还含未转义的日期时间占位符
+_FORMAT_STRIP_PATTERN = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+_DATE_FORMAT_PATTERN = re.compile(r'(?<![_\\])[dmhysDMHYS]')
+# 时长格式（如[h]:mm:ss），读成timedelta而不是日期
+_TIMEDELTA_FORMAT_PATTERN = re.compile(r'\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?', re.IGNORECASE)
+# Excel日期序列号的起点，与openpyxl相同
+_WINDOWS_EPOCH = datetime(1899, 12, 30)
+_MAC_EPOCH = datetime(1904, 1, 1)
+
+# 行业关键词库
+INDUSTRY_KEYWORDS = {
+    "制造": ["制造", "生产", "manufacture", "production"],
+    "零售": ["零售", "retail", "distribution", "销售"],
+    "建筑": ["建筑", "construction", "building", "工程"],
+    "医疗": ["医疗", "hospital", "medical"],
+    "教育": ["教育", "education", "school"],
+    "金融": ["金融", "finance", "bank"]
+}
+
+# 采购目标关键词库
+OBJECTIVE_KEYWORDS = {
+    "分类优化": ["分类", "组合", "portfolio", "categorize"],
+    "供应商协作": ["合作", "联合", "协作", "collaboration", "供应商"],
+    "物料计划": ["物料", "计划", "mrp", "生产排期"],
+    "维护维修": ["维护", "维修", "mro", "间接物料"],
+    "成本控制": ["成本", "节约", "降低", "control", "reduce"]
+}
+
+# 每个类别预编译成一个忽略大小写的正则，匹配时对全文只扫描一遍
+INDUSTRY_PATTERNS = {
+    name: re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+    for name, keywords in INDUSTRY_KEYWORDS.items()
+}
+OBJECTIVE_PATTERNS = {
+    name: re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+    for name, keywords in OBJECTIVE_KEYWORDS.items()
+}
+
+# 关键词只在文档开头这一段内查找，标题、摘要通常都在这里，长文档的扫描量因此有上限
+KEYWORD_SCAN_LIMIT = 32 * 1024
+
+
+def _build_keyword_automaton():
+    """把全部关键词构建成一个Aho-Corasick自动机，对全文只需扫描一遍"""
+    # 关键词与待查文本统一用casefold归一大小写，正则路径则直接用re.IGNORECASE
+    automaton = ahocorasick.Automaton()
+    for category_type, table in (("industry", INDUSTRY_KEYWORDS), ("objective", OBJECTIVE_KEYWORDS)):
+        for name, keywords in table.items():
+            for keyword in keywords:
+                automaton.add_word(keyword.casefold(), (category_type, name))
+    automaton.make_automaton()
+    return automaton
+
+
+# 未安装pyahocorasick时退回到上面的预编译正则
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if ahocorasick is not None else None
+
+
+# -------------------- 文档内容提取 --------------------
+def extract_text_from_docx(file_path):
+    """从Word文档中提取文本内容"""
+    try:
+        return '\n'.join(_iter_docx_paragraphs(file_path))
+    except Exception as e:
+        print(f"提取Word内容出错: {e}")
+        return ""
+
+
+def _iter_docx_paragraphs(file_path):
+    """直接流式解析word/document.xml，逐段产出正文段落的文本，不构建完整的文档对象树"""
+    with zipfile.ZipFile(file_path) as zf, zf.open('word/document.xml') as source:
+        depth = 0
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            # 与python-docx的doc.paragraphs一致，只取w:body下的直接段落；表格和文本框中的段落不计入，
+            # 否则文本框（Word在mc:Choice和mc:Fallback中各写一份）里的文字会重复出现
+            if depth == 2:
+                if elem.tag == _W_NS + 'p':
+                    yield ''.join(_iter_paragraph_text(elem))
+                # 正文的子元素处理完即释放，内存占用不随文档长度增长
+                elem.clear()
+
+
+def _iter_paragraph_text(paragraph):
+    """依次产出段落中文字块(w:r)的文字，含超链接内的文字块，制表符和换行与python-docx的处理一致"""
+    for child in paragraph:
+        if child.tag == _W_NS + 'r':
+            runs = (child,)
+        elif child.tag == _W_NS + 'hyperlink':
+            runs = child.iterfind(_W_NS + 'r')
+        else:
+            continue
+        for run in runs:
+            # 只看文字块的直接子元素，嵌在其中的文本框等绘图对象不计入
+            for node in run:
+                if node.tag == _W_NS + 't':
+                    yield node.text or ''
+                elif node.tag == _W_NS + 'tab':
+                    yield '\t'
+                elif node.tag in (_W_NS + 'br', _W_NS + 'cr'):
+                    yield '\n'
+
+
+def extract_text_from_excel(file_path):
+    """从Excel文档中提取列名和前5行样本数据"""
+    try:
+        # .xlsx只需前几行，直接解析XML最快；遇到不常见的文件结构时退回到解析库
+        if file_path.lower().endswith(('.xlsx', '.xlsm')):
+            try:
+                sheets = _fast_xlsx_header_rows(file_path)
+            except Exception as e:
+                print(f"快速读取Excel失败，改用解析库: {e}")
+            else:
+                return '\n'.join(_format_sheet_text(name, rows) for name, rows in sheets)
+
+        # 优先使用calamine（Rust实现，同时支持.xlsx和.xls）
+        if CalamineWorkbook is not None:
+            return _extract_text_with_calamine(file_path)
+
+        # .xls为旧版二进制格式，openpyxl不支持，交给xlrd读取
+        if file_path.lower().endswith('.xls'):
+            return _extract_text_from_xls(file_path)
+
+        from openpyxl import load_workbook  # 用于流式读取Excel文件，用到时才导入
+
+        # 只读模式按行流式读取，避免把整个工作簿加载进内存
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            full_text = []
+            for ws in wb.worksheets:
+                rows = ws.iter_rows(min_row=1, max_row=6, values_only=True)
+                full_text.append(_format_sheet_text(ws.title, rows))
+            return '\n'.join(full_text)
+        finally:
+            wb.close()
+    except Exception as e:
+        print(f"提取Excel内容出错: {e}")
+        return ""
+
+
+def _fast_xlsx_header_rows(file_path, n=5):
+    """直接解析.xlsx中的XML，返回每个工作表的 (名称, [首行, 随后n行])"""
+    with zipfile.ZipFile(file_path) as zf:
+        workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+        relations = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+        targets = {
+            rel.get('Id'): (rel.get('Type'), rel.get('Target'))
+            for rel in relations.iter(_PKG_REL_NS + 'Relationship')
+        }
+        workbook_pr = workbook.find(_S_NS + 'workbookPr')
+        date1904 = workbook_pr is not None and workbook_pr.get('date1904') in ('1', 'true')
+
+        # 先读出各工作表前n+1行的原始单元格，顺便记下用到的共享字符串编号
+        raw_sheets = []
+        shared_indexes = set()
+        for sheet in workbook.iter(_S_NS + 'sheet'):
+            rel_type, target = targets[sheet.get(_R_NS + 'id')]
+            if not rel_type.endswith('/worksheet'):
+                continue  # 图表工作表没有单元格数据
+            sheet_path = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+            rows = _read_xlsx_rows(zf, sheet_path, n + 1)
+            shared_indexes.update(int(v) for row in rows for t, v, _ in row if t == 's')
+            raw_sheets.append((sheet.get('name'), rows))
+        if not raw_sheets:
+            # 如Strict OOXML格式的工作簿命名空间不同，找不到工作表，交给解析库处理
+            raise ValueError("未找到工作表")
+
+        shared_strings = _read_shared_strings(zf, shared_indexes)
+        date_styles = _read_date_styles(zf) if any(
+            style is not None for _, rows in raw_sheets for row in rows for _, _, style in row
+        ) else {}
+
+    return [
+        (name, [[_xlsx_cell_value(cell, shared_strings, date_styles, date1904) for cell in row] for row in rows])
+        for name, rows in raw_sheets
+    ]
+
+
+def _read_xlsx_rows(zf, sheet_path, max_row):
+    """流式读取工作表的第1到max_row行，每个单元格为 (类型, 原始值, 样式编号)"""
+    rows = [[] for _ in range(max_row)]
+    with zf.open(sheet_path) as source:
+        row_number = 0
+        for _, elem in ET.iterparse(source, events=('end',)):
+            if elem.tag != _S_NS + 'row':
+                continue
+            row_number = int(elem.get('r', row_number + 1))
+            if row_number > max_row:
+                break
+            for cell in elem.iter(_S_NS + 'c'):
+                cell_type = cell.get('t', 'n')
+                if cell_type == 'inlineStr':
+                    value = ''.join(t.text or '' for t in cell.iter(_S_NS + 't'))
+                else:
+                    v = cell.find(_S_NS + 'v')
+                    value = v.text if v is not None else None
+                if value is not None:
+                    rows[row_number - 1].append((cell_type, value, cell.get('s')))
+            elem.clear()
+    return rows
+
+
+def _read_shared_strings(zf, indexes):
+    """只取出需要的共享字符串，读到最大编号即停止"""
+    if not indexes:
+        return {}
+    last_index = max(indexes)
+    strings = {}
+    with zf.open('xl/sharedStrings.xml') as source:
+        index = 0
+        for _, elem in ET.iterparse(source, events=('end',)):
+            if elem.tag != _S_NS + 'si':
+                continue
+            if index in indexes:
+                # 注音(rPh)中的文字不属于单元格内容
+                phonetic = {id(t) for rph in elem.iter(_S_NS + 'rPh') for t in rph.iter(_S_NS + 't')}
+                strings[index] = ''.join(t.text or '' for t in elem.iter(_S_NS + 't') if id(t) not in phonetic)
+            elem.clear()
+            if index >= last_index:
+                break
+            index += 1
+    return strings
+
+
+def _is_date_format(code):
+    """数字格式是否为日期/时间，只看第一段格式（正数部分）"""
+    code = _FORMAT_STRIP_PATTERN.sub('', code.split(';')[0])
+    return _DATE_FORMAT_PATTERN.search(code) is not None
+
+
+def _is_timedelta_format(code):
+    """数字格式是否为时长，只看第一段格式"""
+    return _TIMEDELTA_FORMAT_PATTERN.search(code.split(';')[0]) is not None
+
+
+def _read_date_styles(zf):
+    """返回数字格式为日期/时间的单元格样式编号，值表示该格式是否为时长"""
+    try:
+        styles = ET.fromstring(zf.read('xl/styles.xml'))
+    except KeyError:
+        return {}
+    cell_xfs = styles.find(_S_NS + 'cellXfs')
+    if cell_xfs is None:
+        return {}
+    # 自定义格式优先于同编号的内置格式
+    formats = dict(_BUILTIN_DATE_FORMATS)
+    formats.update(
+        (int(fmt.get('numFmtId')), fmt.get('formatCode', ''))
+        for fmt in styles.iter(_S_NS + 'numFmt')
+    )
+    date_styles = {}
+    for i, xf in enumerate(cell_xfs.iter(_S_NS + 'xf')):
+        code = formats.get(int(xf.get('numFmtId', 0)))
+        if code is not None and _is_date_format(code):
+            date_styles[str(i)] = _is_timedelta_format(code)
+    return date_styles
+
+
+def _from_excel_serial(value, date1904, is_timedelta):
+    """把Excel日期序列号转换为datetime/time/timedelta，规则与openpyxl.utils.datetime.from_excel相同"""
+    if is_timedelta:
+        td = timedelta(days=value)
+        if td.microseconds:
+            # 精确到毫秒
+            td = timedelta(seconds=td.total_seconds() // 1, microseconds=round(td.microseconds, -3))
+        return td
+    epoch = _MAC_EPOCH if date1904 else _WINDOWS_EPOCH
+    day, fraction = divmod(value, 1)
+    diff = timedelta(milliseconds=round(fraction * 86400 * 1000))
+    # 小于1的序列号只有时间部分
+    if 0 <= value < 1 and diff.days == 0:
+        minutes, seconds = divmod(diff.seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return time(hours, minutes, seconds, diff.microseconds)
+    # Excel把1900年当作闰年，1900-03-01之前的序列号要多加一天
+    if 0 < value < 60 and epoch == _WINDOWS_EPOCH:
+        day += 1
+    return epoch + timedelta(days=day) + diff
+
+
+def _xlsx_cell_value(cell, shared_strings, date_styles, date1904):
+    """把原始单元格转换成与openpyxl一致的Python值"""
+    cell_type, value, style = cell
+    if cell_type == 's':
+        return shared_strings[int(value)]
+    if cell_type == 'b':
+        return value == '1'
+    if cell_type != 'n':
+        return value
+    number = float(value) if any(ch in value for ch in '.Ee') else int(value)
+    if style in date_styles:
+        return _from_excel_serial(number, date1904, date_styles[style])
+    return number
+
+
+def _extract_text_with_calamine(file_path):
+    """用calamine读取每个工作表的列名和前5行样本数据"""
+    wb = CalamineWorkbook.from_path(file_path)
+    try:
+        full_text = []
+        for sheet_name in wb.sheet_names:
+            rows = islice(wb.get_sheet_by_name(sheet_name).iter_rows(), 6)
+            # calamine把数字一律读成浮点数，整数值还原成int，与openpyxl的输出一致
+            rows = ([int(val) if isinstance(val, float) and val.is_integer() else val for val in row] for row in rows)
+            full_text.append(_format_sheet_text(sheet_name, rows))
+        return '\n'.join(full_text)
+    finally:
+        # 及时释放文件句柄，进程池中的工作进程会反复处理多个文件
+        wb.close()
+
+
+def _extract_text_from_xls(file_path):
+    """读取.xls文件的列名和前5行样本数据"""
+    import xlrd  # 需要安装xlrd库，仅.xls文件用到
+
+    book = xlrd.open_workbook(file_path, on_demand=True)
+    try:
+        full_text = []
+        for sheet in book.sheets():
+            rows = (sheet.row_values(i) for i in range(min(sheet.nrows, 6)))
+            full_text.append(_format_sheet_text(sheet.name, rows))
+        return '\n'.join(full_text)
+    finally:
+        book.release_resources()
+
+
+def _format_sheet_text(sheet_name, rows):
+    """将工作表的首行（列名）和随后5行样本数据整理为文本"""
+    sheet_text = f"工作表: {sheet_name}\n"
+    rows = iter(rows)
+
+    # 提取列名
+    header = next(rows, ())
+    columns = [str(col) for col in header if col is not None and col != ""]
+    if columns:
+        sheet_text += f"列名: {', '.join(columns)}\n"
+
+    # 提取前5行数据作为样本
+    sample_data = []
+    for row in rows:
+        row_data = [str(val) for val in row if val is not None and val != ""]
+        if row_data:
+            sample_data.append(', '.join(row_data))
+
+    if sample_data:
+        sheet_text += f"样本数据: {'; '.join(sample_data)}\n"
+
+    return sheet_text
+
+
+def extract_text_from_csv(file_path):
+    """从CSV文件中提取列名和前5行样本数据"""
+    try:
+        # 用于流式读取CSV文件，用到时才导入
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pv
+
+        # 流式读取，拿够5行样本即停止，不解析整个文件
+        read_options = pv.ReadOptions(block_size=1 << 16)
+        reader = pv.open_csv(
+            file_path,
+            read_options=read_options,
+            convert_options=pv.ConvertOptions(strings_can_be_null=True),
+        )
+        # pyarrow会把日期/时间列解析成date/time/timestamp，输出时格式会变（如13:00变成13:00:00）；
+        # 这些列按字符串重新读取，保留文件中的原文，与pandas默认不解析日期一致
+        temporal_columns = {field.name: pa.string() for field in reader.schema if pa.types.is_temporal(field.type)}
+        if temporal_columns:
+            reader.close()
+            reader = pv.open_csv(
+                file_path,
+                read_options=read_options,
+                convert_options=pv.ConvertOptions(strings_can_be_null=True, column_types=temporal_columns),
+            )
+        try:
+            column_names = reader.schema.names
+            batches = []
+            num_rows = 0
+            while num_rows < 5:
+                try:
+                    batch = reader.read_next_batch()
+                except StopIteration:
+                    break
+                batches.append(batch)
+                num_rows += batch.num_rows
+            sample = pa.Table.from_batches(batches, schema=reader.schema).slice(0, 5)
+        finally:
+            reader.close()
+
+        def column_to_str(col):
+            # 布尔和浮点列保留Python的str()写法（True、1.0），与原来的输出一致；
+            # 其余列在Arrow中整列转成字符串，空值保持为None
+            if pa.types.is_boolean(col.type) or pa.types.is_floating(col.type):
+                return [None if val is None else str(val) for val in col.to_pylist()]
+            return pc.cast(col, pa.string()).to_pylist()
+
+        rows = zip(*(column_to_str(col) for col in sample.columns))
+
+        full_text = []
+
+        # 提取列名
+        columns = [str(col) for col in column_names if col]
+        if columns:
+            full_text.append(f"列名: {', '.join(columns)}")
+
+        # 提取前5行数据作为样本
+        sample_data = []
+        for row in rows:
+            row_data = [str(val) for val in row if val is not None]
+            if row_data:
+                sample_data.append(', '.join(row_data))
+
+        if sample_data:
+            full_text.append(f"样本数据: {'; '.join(sample_data)}")
+
+        return '\n'.join(full_text)
+    except Exception as e:
+        print(f"提取CSV内容出错: {e}")
+        return ""
+
+
+# 按扩展名分派的 (提取函数, 文件类型)；提取函数为None表示可以上传但暂不支持内容提取
+FILE_EXTRACTORS = {
+    ".docx": (extract_text_from_docx, "Word文档"),
+    ".doc": (None, "Word文档"),
+    ".xlsx": (extract_text_from_excel, "Excel文档"),
+    ".xls": (extract_text_from_excel, "Excel文档"),
+    ".csv": (extract_text_from_csv, "CSV文件"),
+    ".pdf": (None, "PDF文档"),
+}
+
+
+# -------------------- 进程池解析与结果缓存 --------------------
+# 文档解析放在独立的进程池中执行，不阻塞Gradio的工作线程；
+# 每个子进程处理一定数量的任务后重启，回收解析库残留的内存
+_EXTRACT_POOL_MAX_TASKS = 20
+_extract_pool = None
+
+# 文本提取结果缓存，键为 (路径, 大小, 修改时间)，文件变化后自动失效
+_EXTRACT_CACHE_SIZE = 64
+_extract_cache: Dict[Tuple[str, int, float], str] = {}
+
+
+def _get_extract_pool():
+    """首次解析时才创建进程池，子进程导入本模块时不会再各自创建"""
+    global _extract_pool
+    if _extract_pool is None:
+        _extract_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            max_tasks_per_child=_EXTRACT_POOL_MAX_TASKS,
+        )
+    return _extract_pool
+
+
+def _reset_extract_pool(broken_pool):
+    """关闭已损坏的进程池，下次调用_get_extract_pool时重新创建"""
+    global _extract_pool
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+    # 并发请求可能已经换上了新的进程池，只清掉损坏的那一个
+    if _extract_pool is broken_pool:
+        _extract_pool = None
+
+
+async def cached_extract(extractor, file_path, file_stat=None):
+    """在进程池中调用文本提取函数并缓存结果，同一文件重复分析时不再重新解析"""
+    stat = file_stat if file_stat is not None else os.stat(file_path)
+    key = (file_path, stat.st_size, stat.st_mtime)
+    if key not in _extract_cache:
+        pool = _get_extract_pool()
+        try:
+            text = await asyncio.wrap_future(pool.submit(extractor, file_path))
+        except BrokenProcessPool as e:
+            # 子进程异常退出（如内存不足被杀）后进程池不可再用，丢弃它，下次解析时重新创建；
+            # 失败结果不写入缓存，与提取函数出错时一样返回空文本
+            _reset_extract_pool(pool)
+            print(f"解析进程异常退出: {e}")
+            return ""
+        if len(_extract_cache) >= _EXTRACT_CACHE_SIZE:
+            # 字典按插入顺序保存，淘汰最早的一条
+            _extract_cache.pop(next(iter(_extract_cache)))
+        _extract_cache[key] = text
+    return _extract_cache[key]
+
+
+async def extract_file(file_path):
+    """读取单个文件的基础信息并提取内容，返回 (文件名, 文件类型, 文件大小, 提取内容, 是否支持提取)"""
+    file_name = os.path.basename(file_path)
+    # 只stat一次，文件大小和提取缓存共用
+    file_stat = os.stat(file_path)
+    extractor, file_type = FILE_EXTRACTORS.get(os.path.splitext(file_name)[1].lower(), (None, "其他文件"))
+    if extractor is None:
+        return file_name, file_type, file_stat.st_size, "暂不支持该类型文件的内容提取", False
+    text = await cached_extract(extractor, file_path, file_stat)
+    return file_name, file_type, file_stat.st_size, text, True
+
+
+# -------------------- 关键词识别 --------------------
+def extract_keywords(text):
+    """从文本中提取行业和采购目标关键词"""
+    if not text:
+        return "", ""
+
+    text = text[:KEYWORD_SCAN_LIMIT]
+
+    if _KEYWORD_AUTOMATON is not None:
+        # 一次扫描收集命中的类别，再按关键词库顺序取第一个，与正则路径结果一致
+        matched = {value for _, value in _KEYWORD_AUTOMATON.iter(text.casefold())}
+        industry = next((ind for ind in INDUSTRY_KEYWORDS if ("industry", ind) in matched), "")
+        objective = next((obj for obj in OBJECTIVE_KEYWORDS if ("objective", obj) in matched), "")
+        return industry, objective
+
+    # 提取行业
+    industry = ""
+    for ind, pattern in INDUSTRY_PATTERNS.items():
+        if pattern.search(text):
+            industry = ind
+            break
+
+    # 提取采购目标
+    objective = ""
+    for obj, pattern in OBJECTIVE_PATTERNS.items():
+        if pattern.search(text):
+            objective = obj
+            break
+
+    return industry, objective
+
+
+# -------------------- 多文件汇总 --------------------
+# 文件分析报告的结论
+ANALYSIS_CONCLUSIONS = [
+    "文件数据完整度高，可用于采购策略建模。",
+    "数据存在零散性，建议先做标准化清洗。",
+    "内容与采购场景强相关，适合辅助方法论落地。",
+    "数据呈现出明确的采购模式，可直接应用推荐的方法论。"
+]
+
+# 报告中统计为潜在趋势/异常的百分比数值
+_PERCENT_PATTERN = re.compile(r'\d+(?:\.\d+)?%')
+
+
+def no_progress(value, desc=None):
+    """不在Gradio界面中调用时使用的空进度回调"""
+
+
+async def extract_files(file_paths, progress=no_progress):
+    """并发提取多个文件，返回 (文件名, 文件类型, 总大小MB, 提取内容, 识别到的行业, 识别到的采购目标)"""
+    progress(0.1, desc="读取文件")
+
+    # 多个文件在进程池中并发解析，总耗时取决于最慢的一个文件
+    results = await asyncio.gather(*(extract_file(path) for path in file_paths))
+    file_names, file_types, file_sizes, texts, extractable = zip(*results)
+    # 不支持提取的文件返回的是提示语，不计入提取内容
+    texts = [text for text, can_extract in zip(texts, extractable) if can_extract]
+
+    progress(0.5, desc="识别行业和采购目标")
+
+    # 从提取的文本中获取行业和目标，按上传顺序取第一个识别到的
+    extracted_industry = ""
+    extracted_objective = ""
+    for text in texts:
+        industry, objective = extract_keywords(text)
+        extracted_industry = extracted_industry or industry
+        extracted_objective = extracted_objective or objective
+
+    return (
+        ", ".join(file_names),
+        ", ".join(dict.fromkeys(file_types)),
+        sum(file_sizes) / (1024 * 1024),
+        "\n".join(texts),
+        extracted_industry,
+        extracted_objective,
+    )
+
+
+def summarize_text(file_name, text):
+    """由提取内容计算统计信息，返回 (数据点数, 潜在趋势/异常数, 结论)"""
+    # 非空行数作为数据点，百分比数值作为潜在趋势/异常
+    data_points = sum(1 for line in text.splitlines() if line.strip())
+    trends = len(_PERCENT_PATTERN.findall(text))
+    # 结论按文件名和数据点数稳定选取，同一文件每次分析结果一致
+    conclusion_index = zlib.crc32(f"{file_name}:{data_points}".encode('utf-8')) % len(ANALYSIS_CONCLUSIONS)
+    return data_points, trends, ANALYSIS_CONCLUSIONS[conclusion_index]
+
+
+# -------------------- 采购方法论推荐 --------------------
+# 卡拉杰克采购组合模型流程图
+_FLOW_KRALJIC = """
+        ```mermaid
+        graph TD
+            A[确定采购物品清单] --> B[分析物品重要性<br/>(对业务影响)]
+            A --> C[分析供应风险<br/>(稀缺性/替代难度)]
+            B --> D{重要性高?}
+            C --> E{供应风险高?}
+            D -->|是| F[战略型物品<br/>(例：核心零部件)]
+            D -->|否| G[杠杆型物品<br/>(例：标准化原材料)]
+            E -->|是| H[瓶颈型物品<br/>(例：独家配件)]
+            E -->|否| I[常规型物品<br/>(例：办公用品)]
+            F --> J[建立长期战略合作]
+            G --> K[集中采购+招标压价]
+            H --> L[多源寻源+库存缓冲]
+            I --> M[简化流程+自动化采购]
+        ```
+        """
+
+# VMI联合价值创造模型流程图
+_FLOW_VMI = """
+        ```mermaid
+        graph TD
+            A[供需双方签订VMI协议] --> B[共享销售/库存数据<br/>(实时同步)]
+            B --> C[供应商预测需求<br/>(结合历史数据)]
+            C --> D{库存低于安全线?}
+            D -->|是| E[自动补货至目标库存]
+            D -->|否| F[维持现有库存]
+            E --> G[双方定期复盘<br/>(调整预测模型)]
+            G --> B[循环优化]
+        ```
+        """
+
+# MRP物料需求计划方法论流程图
+_FLOW_MRP = """
+        ```mermaid
+        graph TD
+            A[制定主生产计划<br/>(MPS)] --> B[分解物料清单<br/>(BOM层级展开)]
+            B --> C[统计现有库存<br/>(含在途/在制)]
+            C --> D[计算净需求<br/>(毛需求-库存-在途)]
+            D --> E{净需求>0?}
+            E -->|是| F[生成采购订单<br/>(按提前期)]
+            E -->|否| G[无需采购]
+            F --> H[跟踪订单交付<br/>(与生产计划匹配)]
+            H --> I[生产执行与反馈]
+        ```
+        """
+
+# MRO分类采购管理方法论流程图
+_FLOW_MRO = """
+        ```mermaid
+        graph TD
+            A[梳理MRO物料清单] --> B[分类：<br/>1. 高频低价值<br/>2. 低频高价值<br/>3. 应急必需]
+            B --> C[高频低价值：<br/>长期协议+自动补货]
+            B --> D[低频高价值：<br/>战略寻源+最小库存]
+            B --> E[应急必需：<br/>多供应商+安全库存]
+            C --> F[定期消耗分析<br/>(优化补货参数)]
+            D --> G[供应商响应速度考核]
+            E --> H[模拟应急场景<br/>(测试供应能力)]
+        ```
+        """
+
+# TCO总成本优化方法论流程图
+_FLOW_TCO = """
+        ```mermaid
+        graph TD
+            A[确定分析对象<br/>(单一物品/品类)] --> B[计算采购成本<br/>(价格+运输+税费)]
+            B --> C[计算使用成本<br/>(能耗+维护+人工)]
+            C --> D[计算处置成本<br/>(报废+环保+替代)]
+            D --> E[汇总TCO=B+C+D]
+            E --> F[识别成本占比最高项<br/>(例如：维护成本过高)]
+            F --> G[针对性优化<br/>(例：换高效型号)]
+            G --> H[验证优化效果<br/>(TCO降低比例)]
+        ```
+        """
+
+# 采购策略综合评估法流程图
+_FLOW_DEFAULT = """
+        ```mermaid
+        graph TD
+            A[明确采购目标<br/>(降本/保供/创新)] --> B[分析物品特性<br/>(价值/风险/复杂度)]
+            B --> C[评估现有供应商<br/>(能力/合作历史)]
+            C --> D[梳理内外部约束<br/>(预算/时间/政策)]
+            D --> E[匹配候选方法论<br/>(对比优缺点)]
+            E --> F[小范围试点验证]
+            F --> G[全面推广+持续迭代]
+        ```
+        """
+
+# 方法论匹配规则，按顺序取第一条命中的：(采购目标关键词, 限定行业关键词, (标题, 描述, 流程图))
+# 推荐用的关键词单独维护，不复用上面文件内容识别的关键词库，两者的用途和粒度不同
+_ADVICE_RULES = [
+    # 1. 卡拉杰克采购组合模型
+    (("分类", "组合", "portfolio", "categorize"), None, (
+        "卡拉杰克采购组合模型",
+        "通过「战略型、杠杆型、瓶颈型、常规型」分类，优化采购资源与供应商关系，降本提效。",
+        _FLOW_KRALJIC,
+    )),
+    # 2. VMI联合价值创造模型
+    (("合作", "联合", "协作", "collaboration"), None, (
+        "VMI联合价值创造模型",
+        "供应商深度参与库存管理，减少积压/缺货，适合长期战略合作场景。",
+        _FLOW_VMI,
+    )),
+    # 3. MRP物料需求计划方法论，仅限制造业
+    (("物料计划", "mrp", "生产排期"), ("制造", "生产", "manufacture"), (
+        "MRP物料需求计划方法论",
+        "基于生产计划精准计算物料需求，减少库存浪费，适配制造型企业排产。",
+        _FLOW_MRP,
+    )),
+    # 4. MRO分类采购管理方法论
+    (("维护", "维修", "mro", "间接物料"), None, (
+        "MRO分类采购管理方法论",
+        "聚焦非生产物料（维护/维修/运营），分类管控间接采购成本，保障产线稳定。",
+        _FLOW_MRO,
+    )),
+    # 5. TCO总成本优化方法论
+    (("成本", "节约", "降低", "control", "reduce"), None, (
+        "TCO总成本优化方法论",
+        "从采购、使用到处置的全生命周期成本分析，识别隐性节约空间，系统性降低总拥有成本。",
+        _FLOW_TCO,
+    )),
+]
+
+# 默认：采购策略综合评估法
+_DEFAULT_ADVICE = (
+    "采购策略综合评估法",
+    "建议先梳理采购物品属性、供应商关系、成本结构，再适配具体方法论。",
+    _FLOW_DEFAULT,
+)
+
+
+@lru_cache(maxsize=512)
+def get_procurement_advice_with_flow(industry: str, objective: str) -> Tuple[str, str, str]:
+    """根据行业背景 + 采购目标推荐方法论，返回标题、描述、流程图(mermaid代码)"""
+    # 统一转小写，方便关键词匹配
+    industry_lower = industry.lower().strip()
+    objective_lower = objective.lower().strip()
+    for objective_words, industry_words, advice in _ADVICE_RULES:
+        if any(word in objective_lower for word in objective_words) and (
+            industry_words is None or any(word in industry_lower for word in industry_words)
+        ):
+            return advice
+    return _DEFAULT_ADVICE